@@ -3,19 +3,27 @@ This is a module that removes the parts from the pacoparser generated config whi
 These config parts will further be handled by other tools and will therefore not be pushed by the initial configuration process.
 """
 import argparse
-import copy
 import json
+import mmap
 import os
+import re
 import sys
 import logging
-from typing import List
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, List, Optional, Set
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional, fall back to the json module of the standard library
+    orjson = None  # type: ignore
 
 # define the NetworkInsatnces to keep
 # used in contains match, no need to define the exact name of the NI
 keep_nis = ['infrastructure', "default"]
 
 
-def process(i: str, o: str):
+def process(i: str, o: Optional[str]) -> None:
     """
     The meta process of stripping down the config.
 
@@ -26,143 +34,139 @@ def process(i: str, o: str):
     :return: None
     """
     data = load_data(i)
-    drop_nis(data)
-    in_use_interfaces = deduce_in_use_interfaces(data)
+    in_use_interfaces = drop_nis(data)
     remove_bfd_interfaces(in_use_interfaces, data)
     remove_interfaces(in_use_interfaces, data)
     finish(data, o)
 
 
-class Interface:
-    """
-    This is just an helper container to store interface infos (interface name and unit / index number)
-    Maybe even overkill ... but we can.
-    """
-    def __init__(self, interface_name: str, unit: int):
-        self.interface_name = interface_name
-        self.unit = unit
-
-    @staticmethod
-    def new_interface_from_string(s: str):
-        parts = s.split(".")
-        return Interface(parts[0], int(parts[1]))
-
-    def config_rep(self):
-        return f"{self.interface_name}.{self.unit}"
-
-    def __str__(self):
-        return f"IRB: {self.interface_name}, Unit: {self.unit}"
-
-    def __repr__(self):
-        return self.__str__()
-
-
-def remove_interfaces(interfaces: List[Interface], data):
+def remove_interfaces(interfaces: Set[str], data: Dict[str, Any]) -> None:
     """
     Remove all interfaces other then the given irbs.
 
-    :param interfaces: The interfaces to keep
+    :param interfaces: The interfaces to keep as "<interface name>.<unit>" strings
     :param data: The config
     :return: None
     """
-    result = {}
+    # index the units to keep per interface name, so every entry is looked up only once
+    keep_units: DefaultDict[str, Set[int]] = defaultdict(set)
+    for interface in interfaces:
+        parts = interface.split(".")
+        keep_units[parts[0]].add(int(parts[1]))
 
+    result: Dict[str, Any] = {}
     for entry in data['interface']:
+        units = keep_units.get(entry['name'])
 
-        # add all ethernet interfaces
-        if "ethernet" in entry['name']:
-            interf = copy.deepcopy(entry)
-            interf['subinterface'] = []
-            result[entry['name']] = interf
+        # add all ethernet interfaces as well as the interfaces with subinterfaces in use
+        if units is None and not entry['name'].startswith("ethernet-"):
+            continue
 
-        # process interfaces with subinterfaces
-        for interface in interfaces:
-            if entry['name'] == interface.interface_name:
-                if entry['name'] not in result:
-                    interf = copy.deepcopy(entry)
-                    interf['subinterface'] = []
-                    result[entry['name']] = interf
+        # a shallow copy is sufficient, only the subinterface list is replaced
+        interf = {**entry, 'subinterface': []}
+        if units:
+            interf['subinterface'] = [subif for subif in entry['subinterface'] if subif['index'] in units]
+        result[entry['name']] = interf
 
-                for subif in entry['subinterface']:
-                    if subif['index'] == interface.unit:
-                        interf['subinterface'].append(subif)
+    data['interface'] = list(result.values())
 
-    data['interface'] = [x for x in result.values()]
 
-
-def remove_bfd_interfaces(irbs, data):
+def remove_bfd_interfaces(irbs: Set[str], data: Dict[str, Any]) -> None:
     """
     Remove all other then the provided irb interfaces from the bfd part of the config.
-    :param irbs: the irb interfaces to keep
+    :param irbs: the irb interfaces to keep as "<interface name>.<unit>" strings
     :param data: the config
     :return: None
     """
-    match = []
-    for entry in data['bfd']['subinterface']:
-        for irb in irbs:
-            if entry['id'] == irb.config_rep():
-                match.append(entry)
-    data['bfd']['subinterface'] = match
+    data['bfd']['subinterface'] = [entry for entry in data['bfd']['subinterface'] if entry['id'] in irbs]
 
 
-def deduce_in_use_interfaces(data):
-    """
-    Figure out what the IRB interfaces are in the (remaining) NetworkInstances
-    :param data: the config blob
-    :return: None
-    """
-    interfs = set()
-    for entry in data['network-instance']:
-        for interface in entry['interface']:
-            interfs.add(interface['name'])
-
-    result = []
-    for x in interfs:
-        result.append(Interface.new_interface_from_string(x))
-    return result
-
-
-def finish(data, o: str):
+def finish(data: Dict[str, Any], o: Optional[str]) -> None:
     """
     Finish the process by writing the data to disk.
 
+    If orjson is installed it is used instead of the json module. In contrast to the json module it writes non-ASCII
+    characters as UTF-8 instead of escaping them (see load_data for the differences when reading).
+
     :param data: the python struct that is to be written to the file
     :param o: the ouput filename
     :return: None
     """
-    if o is not None:
-        with open(o, "w+") as outfile:
-            json.dump(data, outfile, indent="  ")
+    if orjson is not None:
+        if o is not None:
+            with open(o, "wb") as outfile:
+                outfile.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            out = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+            # write the bytes directly if possible, decoding them first would create another copy of the whole
+            # document. Replaced stdout streams (e.g. io.StringIO) do not have a binary buffer though.
+            buffer = getattr(sys.stdout, 'buffer', None)
+            if buffer is not None:
+                sys.stdout.flush()
+                buffer.write(out)
+                buffer.flush()
+            else:
+                sys.stdout.write(out.decode())
+    elif o is not None:
+        # json.dump writes many small chunks, use a large buffer to keep the number of write calls down
+        with open(o, "w", buffering=1 << 20) as outfile:
+            json.dump(data, outfile, indent=2)
     else:
-        print(json.dumps(data, indent="  "))
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
 
-def drop_nis(data):
+def drop_nis(data: Dict[str, Any]) -> Set[str]:
     """
     Delete all the Network instances that do not match the "keep_nis" as substrings of the NI name.
+    The interfaces in use by the remaining NIs are collected in the same pass.
     :param data: The switch config. It will be updated in place
-    :return: None
+    :return: the interfaces in use as "<interface name>.<unit>" strings
     """
-    result = []
+    result: List[Dict[str, Any]] = []
+    interfaces: Set[str] = set()
+    if not keep_nis:
+        data['network-instance'] = result
+        return interfaces
+
+    # all keep_nis parts combined into a single pattern, so every NI name is scanned only once
+    keep_nis_re = re.compile("|".join(map(re.escape, keep_nis)))
     for entry in data['network-instance']:
-        for match_name_part in keep_nis:
-            if match_name_part in entry['name']:
-                result.append(entry)
+        if keep_nis_re.search(entry['name']):
+            result.append(entry)
+            interfaces.update(sys.intern(interface['name']) for interface in entry['interface'])
     data['network-instance'] = result
+    return interfaces
 
 
-def load_data(i: str):
+def load_data(i: str) -> Dict[str, Any]:
     """
     Load data from the given file.
+
+    The whole document is loaded on purpose. Only the network-instance, interface and bfd parts are filtered,
+    all other parts of the config are written out unchanged.
+
+    If orjson is installed it is used instead of the json module, which differs for input outside of plain JSON:
+    integers outside of the signed / unsigned 64 bit range are read as floats, and NaN, Infinity and -Infinity are
+    rejected as invalid JSON. Regular SR Linux config values are not affected.
+
     :param i: filename with path
     :return: the json data
     """
-    if not os.path.isfile(i):
+    try:
+        file = open(i, 'rb')
+    except (FileNotFoundError, IsADirectoryError):
         logging.error(f"Inputfile {i} does not exist.")
         sys.exit(1)
-    with open(i, 'r') as file:
-        data = json.load(file)
-    return data
+    with file:
+        if orjson is not None:
+            if os.fstat(file.fileno()).st_size == 0:
+                # an empty file cannot be mapped, let the parser report it as invalid json
+                return orjson.loads(file.read())
+            # hand the mapped file to the parser, so the content is not copied into a bytes object first
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        return json.load(file)
 
 
 if __name__ == '__main__':
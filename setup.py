@@ -1,5 +1,13 @@
+import os
+
 from setuptools import setup, find_packages
 
+# set PACO_MYPYC=1 to compile the filter module to a C extension with mypyc (requires mypy)
+ext_modules = []
+if os.environ.get('PACO_MYPYC') == '1':
+    from mypyc.build import mypycify
+    ext_modules = mypycify(['nokia/paco/config_filter.py'])
+
 setup(
     name='PacoConfigFilter',
     version='0.1.1',
@@ -8,5 +16,9 @@ setup(
     license='',
     author='MVahlenkamp',
     author_email='markus@vahlenkamp.net',
-    description=''
+    description='',
+    extras_require={
+        'orjson': ['orjson'],
+    },
+    ext_modules=ext_modules,
 )
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from nokia.paco import config_filter
+
+CONFIG = {
+    "system": {"name": {"host-name": "leaf1"}},
+    "network-instance": [
+        {"name": "default", "interface": [{"name": "ethernet-1/49.0"}, {"name": "irb0.1"}]},
+        # matches both keep_nis parts, must still be kept only once
+        {"name": "infrastructure-default", "interface": [{"name": "irb0.2"}, {"name": "irb0.1"}]},
+        {"name": "tenant-1", "interface": [{"name": "irb0.5"}, {"name": "irb1.1"}]},
+    ],
+    "interface": [
+        {"name": "ethernet-1/1", "admin-state": "enable", "subinterface": [{"index": 10}, {"index": 0}]},
+        {"name": "ethernet-1/49", "subinterface": [{"index": 1}, {"index": 0}]},
+        {"name": "irb0", "subinterface": [{"index": 5}, {"index": 2}, {"index": 1}]},
+        {"name": "irb1", "subinterface": [{"index": 1}]},
+        {"name": "mgmt0", "subinterface": [{"index": 0}]},
+        {"name": "lag-ethernet", "subinterface": [{"index": 0}]},
+    ],
+    "bfd": {"subinterface": [{"id": "irb0.1"}, {"id": "irb0.5"}, {"id": "ethernet-1/49.0"}, {"id": "irb1.1"}]},
+}
+
+EXPECTED_INTERFACES = [
+    {"name": "ethernet-1/1", "admin-state": "enable", "subinterface": []},
+    {"name": "ethernet-1/49", "subinterface": [{"index": 0}]},
+    {"name": "irb0", "subinterface": [{"index": 2}, {"index": 1}]},
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    """
+    Run a test once with orjson (if installed) and once with the json fallback.
+    """
+    if request.param == "orjson":
+        if config_filter.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(config_filter, "orjson", None)
+    return request.param
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(CONFIG))
+    return str(path)
+
+
+def check_filtered(data):
+    assert data["system"] == CONFIG["system"]
+    assert [ni["name"] for ni in data["network-instance"]] == ["default", "infrastructure-default"]
+    assert data["interface"] == EXPECTED_INTERFACES
+    assert data["bfd"]["subinterface"] == [{"id": "irb0.1"}, {"id": "ethernet-1/49.0"}]
+
+
+def test_process_to_file(json_backend, input_file, tmp_path):
+    output_file = tmp_path / "out.json"
+    config_filter.process(input_file, str(output_file))
+    check_filtered(json.loads(output_file.read_text()))
+
+
+def test_process_to_stdout(json_backend, input_file, capsys):
+    config_filter.process(input_file, None)
+    check_filtered(json.loads(capsys.readouterr().out))
+
+
+def test_empty_keep_nis_drops_all_nis(monkeypatch):
+    monkeypatch.setattr(config_filter, "keep_nis", [])
+    data = json.loads(json.dumps(CONFIG))
+    assert config_filter.drop_nis(data) == set()
+    assert data["network-instance"] == []
+
+
+@pytest.mark.parametrize("name", ["missing.json", ""])
+def test_missing_input_file_exits(json_backend, tmp_path, name):
+    # an empty name points to the directory itself
+    with pytest.raises(SystemExit) as exc:
+        config_filter.process(str(tmp_path / name), None)
+    assert exc.value.code == 1